@@ -41,7 +41,10 @@ setup(
     install_requires=[
         "ugrc-palletjack>=5.0,<5.3",
         "ugrc-supervisor==3.*",
-        "gql>=3.5,<4.1",
+        "gql==4.0.*",
+        "orjson==3.*",
+        "pyarrow>=14",
+        "pyproj>=3.1",
     ],
     extras_require={
         "tests": [
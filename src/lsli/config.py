@@ -46,6 +46,8 @@ GRAPHQl_QUERY = """
         }
         """
 GRAPHQL_LIMIT = 5000
+GRAPHQL_CONCURRENT_PAGES = 4  #: Max number of pages to request from the GraphQL endpoint at once
+GRAPHQL_BATCH_SIZE = 1  #: Pages per HTTP request; raise only if the endpoint supports query batching
 
 # POINTS_FEATURE_LAYER_ITEMID = "7d081afc93624d87af7bdf9aaee5163f"  #: testing layer
 POINTS_FEATURE_LAYER_ITEMID = "5522c429f21d4b179c50bc07fbbbff35"  #: live layer
@@ -4,21 +4,29 @@
 Run the lsli script as a cloud function.
 """
 
-import json
 import logging
+import re
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
 from tempfile import TemporaryDirectory
 from types import SimpleNamespace
 
 import arcgis
-import geopandas as gpd
 import numpy as np
+import orjson
 import pandas as pd
-from gql import Client, gql
+import pyarrow as pa
+from gql import Client, GraphQLRequest, gql
 from gql.transport.requests import RequestsHTTPTransport
 from palletjack import extract, load, transform, utils
+from pyproj import Transformer
 from supervisor.message_handlers import SendGridHandler
 from supervisor.models import MessageDetails, Supervisor
 
@@ -32,10 +40,25 @@ except ImportError:
 
 module_logger = logging.getLogger(config.SKID_NAME)
 
+#: The system number portion of a PWSID like Utah01234, UTAHZ01234, or 01234; PWSIDs without it are invalid
+PWSID_DIGITS_REGEX = re.compile(r"(\d+)")
 
+#: The timestamp format Google Forms writes to the approved systems sheet
+FORM_TIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+#: Build the projection pipeline once instead of on every reprojection
+UTM_TO_WEB_MERCATOR = Transformer.from_crs(26912, 3857, always_xy=True)
+
+#: Web Mercator's sphere radius (the WGS84 semi-major axis)
+WEB_MERCATOR_RADIUS = 6378137.0
+
+
+@lru_cache(maxsize=1)
 def _get_secrets():
     """A helper method for loading secrets from either a GCF mount point or the local src/lsli/secrets/secrets.json file
 
+    The secrets don't change for the life of the process, so the result is cached after the first read.
+
     Raises:
         FileNotFoundError: If the secrets file can't be found.
 
@@ -47,19 +70,135 @@ def _get_secrets():
 
     #: Try to get the secrets from the Cloud Function mount point
     if secret_folder.exists():
-        return json.loads(Path("/secrets/app/secrets.json").read_text(encoding="utf-8"))
+        return orjson.loads(Path("/secrets/app/secrets.json").read_bytes())
 
     #: Otherwise, try to load a local copy for local development
     secret_folder = Path(__file__).parent / "secrets"
     if secret_folder.exists():
-        return json.loads((secret_folder / "secrets.json").read_text(encoding="utf-8"))
+        return orjson.loads((secret_folder / "secrets.json").read_bytes())
 
     raise FileNotFoundError("Secrets folder not found; secrets not loaded.")
 
 
+def _connect_graphql_session(url, thread_sessions, clients):
+    """Connect a GraphQL session for the current worker thread
+
+    Used as the thread pool's initializer so each worker gets its own session (a session can only run one request at a
+    time) and keeps its HTTP connection open between pages. The schema isn't fetched from the endpoint because we
+    don't validate queries client-side; this saves an introspection round trip.
+
+    Args:
+        url (str): GraphQL endpoint URL
+        thread_sessions (threading.local): Per-thread storage the connected session is saved to as .session
+        clients (list<gql.Client>): Every connected client is appended here so the caller can close them
+    """
+
+    transport = RequestsHTTPTransport(
+        url=url,
+        verify=True,
+        retries=3,
+        json_deserialize=orjson.loads,
+    )
+    client = Client(transport=transport, fetch_schema_from_transport=False)
+    thread_sessions.session = client.connect_sync()
+    clients.append(client)
+
+
+def _fetch_graphql_pages(thread_sessions, query, offset, limit, batch_size=1):
+    """Fetch consecutive pages of records from the GraphQL endpoint using this thread's session
+
+    When batch_size is more than one, all the pages are sent in a single batched HTTP request.
+
+    Args:
+        thread_sessions (threading.local): Per-thread storage holding this thread's connected session
+        query (gql.GraphQLRequest): Parsed GraphQL query
+        offset (int): The number of records to skip before the first page
+        limit (int): The max number of records to return per page
+        batch_size (int, optional): The number of consecutive pages to request. Defaults to 1.
+
+    Returns:
+        list<list<dict>>: The records in each page, in offset order
+    """
+
+    session = thread_sessions.session
+    requests = [
+        GraphQLRequest(query, variable_values={"offset": offset + i * limit, "limit": limit}) for i in range(batch_size)
+    ]
+    if batch_size == 1:
+        results = [session.execute(requests[0], parse_result=True)]
+    else:
+        results = session.execute_batch(requests, parse_result=True)
+
+    pages = [result["getLccrMapUGRC"] for result in results]
+    for i, records in enumerate(pages):
+        module_logger.debug("Offset: %s, Length: %s", format(offset + i * limit, ","), format(len(records), ","))
+
+    return pages
+
+
+@lru_cache(maxsize=4)
+def _parse_graphql_query(query):
+    """Parse a GraphQL query string into a document once per process
+
+    Args:
+        query (str): GraphQL query string
+
+    Returns:
+        gql.GraphQLRequest: The parsed query
+    """
+
+    return gql(query)
+
+
+def _wgs84_to_web_mercator(longitude, latitude):
+    """Project WGS84 coordinates to Web Mercator with the closed-form spherical mercator equations
+
+    Web Mercator treats WGS84 lat/long as spherical, so this matches PROJ's EPSG:4326 to EPSG:3857 transformation
+    while running as a handful of numpy ufuncs over the whole array.
+
+    Args:
+        longitude (np.ndarray): WGS84 longitudes in degrees
+        latitude (np.ndarray): WGS84 latitudes in degrees
+
+    Returns:
+        tuple<np.ndarray, np.ndarray>: The Web Mercator x and y values
+    """
+
+    x = WEB_MERCATOR_RADIUS * np.radians(longitude)
+    y = WEB_MERCATOR_RADIUS * np.log(np.tan(np.pi / 4 + np.radians(latitude) / 2))
+
+    return x, y
+
+
+@lru_cache(maxsize=8)
+def _agol_column_names(columns):
+    """Build the AGOL-ized, lowercased rename map for a set of columns, leaving the SHAPE column alone
+
+    The columns coming out of the pipeline are the same every run, so the map is cached by the column names. The
+    returned dict is shared between calls and must not be modified.
+
+    Args:
+        columns (tuple<str>): The original column names
+
+    Returns:
+        dict: Mapping of original column names to their AGOL-friendly names
+    """
+
+    cleaned_columns = {
+        original_name: agol_name.lower() for original_name, agol_name in utils.rename_columns_for_agol(columns).items()
+    }
+    cleaned_columns.pop("SHAPE")
+
+    return cleaned_columns
+
+
 def _initialize(log_path, sendgrid_api_key):
     """A helper method to set up logging and supervisor
 
+    The console and file handlers are run from a QueueListener on a background thread so that logging calls only have
+    to put the record on a queue. The listener is attached to the QueueHandler as `listener` so it can be stopped
+    later by _remove_log_file_handlers.
+
     Args:
         log_path (Path): File path for the logfile to be written
         sendgrid_api_key (str): The API key for sendgrid for this particular application
@@ -83,10 +222,13 @@ def _initialize(log_path, sendgrid_api_key):
     log_handler.setLevel(config.LOG_LEVEL)
     log_handler.setFormatter(formatter)
 
-    module_logger.addHandler(cli_handler)
-    module_logger.addHandler(log_handler)
-    palletjack_logger.addHandler(cli_handler)
-    palletjack_logger.addHandler(log_handler)
+    log_queue = SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.listener = QueueListener(log_queue, cli_handler, log_handler, respect_handler_level=True)
+    queue_handler.listener.start()
+
+    module_logger.addHandler(queue_handler)
+    palletjack_logger.addHandler(queue_handler)
 
     #: Log any warnings at logging.WARNING
     #: Put after everything else to prevent creating a duplicate, default formatter
@@ -107,21 +249,27 @@ def _initialize(log_path, sendgrid_api_key):
 
 
 def _remove_log_file_handlers(log_name, loggers):
-    """A helper function to remove the file handlers so the tempdir will close correctly
+    """A helper function to stop the logging listener and close the file handlers so the tempdir will close correctly
+
+    Stopping the listener writes out any records still in the queue.
 
     Args:
         log_name (str): The logfiles filename
         loggers (List<str>): The loggers that are writing to log_name
     """
 
+    queue_handlers = set()
     for logger in loggers:
-        for handler in logger.handlers:
-            try:
-                if log_name in handler.stream.name:
-                    logger.removeHandler(handler)
-                    handler.close()
-            except Exception:
-                pass
+        for handler in logger.handlers[:]:
+            if isinstance(handler, QueueHandler):
+                logger.removeHandler(handler)
+                queue_handlers.add(handler)
+
+    for queue_handler in queue_handlers:
+        queue_handler.listener.stop()
+        for handler in queue_handler.listener.handlers:
+            if isinstance(handler, logging.FileHandler) and log_name in handler.baseFilename:
+                handler.close()
 
 
 def process():
@@ -138,102 +286,120 @@ def process():
         log_path = tempdir_path / log_name
 
         skid_supervisor = _initialize(log_path, secrets.SENDGRID_API_KEY)
+        loggers = [logging.getLogger(config.SKID_NAME), logging.getLogger("palletjack")]
 
-        #: Get our GIS object via the ArcGIS API for Python
-        gis = arcgis.gis.GIS(config.AGOL_ORG, secrets.AGOL_USER, secrets.AGOL_PASSWORD)
-
-        module_logger.info("Loading data from graphql endpoint...")
-        point_data = PointData()
-        point_data.load_records_from_graphql(secrets.GRAPHQL_URL, config.GRAPHQl_QUERY, config.GRAPHQL_LIMIT)
-
-        module_logger.info("Transforming data...")
-        point_data.spatialize_point_data()
-        point_data.clean_point_data()
+        try:
+            #: Get our GIS object via the ArcGIS API for Python
+            gis = arcgis.gis.GIS(config.AGOL_ORG, secrets.AGOL_USER, secrets.AGOL_PASSWORD)
+
+            module_logger.info("Loading data from graphql endpoint...")
+            point_data = PointData()
+            point_data.load_records_from_graphql(
+                secrets.GRAPHQL_URL,
+                config.GRAPHQl_QUERY,
+                config.GRAPHQL_LIMIT,
+                config.GRAPHQL_CONCURRENT_PAGES,
+                config.GRAPHQL_BATCH_SIZE,
+            )
 
-        module_logger.info("Loading point data...")
-        loader = load.ServiceUpdater(gis, config.POINTS_FEATURE_LAYER_ITEMID, working_dir=tempdir_path)
-        features_loaded = loader.truncate_and_load(point_data.spatial_records)
+            module_logger.info("Transforming data...")
+            point_data.spatialize_point_data()
+            point_data.clean_point_data()
 
-        module_logger.info("Loading system area data from Google Sheet...")
-        sheet_data = GoogleSheetData(
-            secrets.SERVICE_ACCOUNT_JSON, secrets.SHEET_ID, secrets.SHEET_NAME, secrets.LINKS_ID, secrets.LINKS_NAME
-        )
-        sheet_data.load_systems_from_sheet()
-        sheet_data.clean_approved_systems()
-        sheet_data.load_system_links_from_gsheet()
-        sheet_data.clean_system_links()
-        sheet_data.merge_systems()
-        sheet_data.load_system_geometries(config.SERVICE_AREA_GEOMETRIES_SERVICE_URL)
-        sheet_data.merge_systems_with_geometries()
-        sheet_data.clean_dataframe_for_agol()
-
-        module_logger.info("Loading system area data to AGOL...")
-        service_area_loader = load.ServiceUpdater(
-            gis, config.SERVICE_AREAS_FEATURE_LAYER_ITEMID, working_dir=tempdir_path
-        )
-        areas_loaded = service_area_loader.truncate_and_load(sheet_data.final_systems)
-
-        end = datetime.now()
-
-        summary_message = MessageDetails()
-        summary_message.subject = f"{config.SKID_NAME} Update Summary"
-        summary_rows = [
-            f'{config.SKID_NAME} update {start.strftime("%Y-%m-%d")}',
-            "=" * 20,
-            "",
-            f'Start time: {start.strftime("%H:%M:%S")}',
-            f'End time: {end.strftime("%H:%M:%S")}',
-            f"Duration: {str(end-start)}",
-            f"Points loaded: {features_loaded:,}",
-            f"Areas loaded: {areas_loaded:,}",
-        ]
+            module_logger.info("Loading point data...")
+            loader = load.ServiceUpdater(gis, config.POINTS_FEATURE_LAYER_ITEMID, working_dir=tempdir_path)
+            features_loaded = loader.truncate_and_load(point_data.spatial_records)
 
-        if not point_data.missing_coords.empty:
-            name_length = point_data.missing_coords["pws_name"].str.len().max()
-            summary_rows.append(f"\n{len(point_data.missing_coords):,} Point records are missing coordinates")
-            summary_rows.append("-" * 20)
-            summary_rows.append(
-                pd.DataFrame(point_data.missing_coords[["pws_id", "pws_name"]].value_counts())
-                .reset_index()
-                .rename(columns={"count": "nulls"})
-                .to_string(
-                    col_space={"pws_id": 10, "pws_name": name_length, "nulls": 5},
-                    justify="left",
-                    index=False,
-                    formatters={
-                        "pws_name": lambda x: "{:<{width}}".format(x, width=name_length),
-                        "nulls": lambda x: "{:,}".format(x),
-                    },
+            module_logger.info("Loading system area data from Google Sheet...")
+            sheet_data = GoogleSheetData(
+                secrets.SERVICE_ACCOUNT_JSON, secrets.SHEET_ID, secrets.SHEET_NAME, secrets.LINKS_ID, secrets.LINKS_NAME
+            )
+            #: The geometries come from a separate service, so fetch them in the background while loading the
+            #: sheets. The sheets share a Google client that isn't thread-safe, so they stay on this thread.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                geometries_future = executor.submit(
+                    sheet_data.load_system_geometries, config.SERVICE_AREA_GEOMETRIES_SERVICE_URL
                 )
+                sheet_data.load_systems_from_sheet()
+                sheet_data.load_system_links_from_gsheet()
+                sheet_data.clean_approved_systems()
+                sheet_data.clean_system_links()
+                sheet_data.merge_systems()
+                geometries_future.result()
+            sheet_data.merge_systems_with_geometries()
+            sheet_data.clean_dataframe_for_agol()
+
+            module_logger.info("Loading system area data to AGOL...")
+            service_area_loader = load.ServiceUpdater(
+                gis, config.SERVICE_AREAS_FEATURE_LAYER_ITEMID, working_dir=tempdir_path
             )
+            areas_loaded = service_area_loader.truncate_and_load(sheet_data.final_systems)
+
+            end = datetime.now()
+
+            summary_message = MessageDetails()
+            summary_message.subject = f"{config.SKID_NAME} Update Summary"
+            summary_rows = [
+                f'{config.SKID_NAME} update {start.strftime("%Y-%m-%d")}',
+                "=" * 20,
+                "",
+                f'Start time: {start.strftime("%H:%M:%S")}',
+                f'End time: {end.strftime("%H:%M:%S")}',
+                f"Duration: {str(end-start)}",
+                f"Points loaded: {features_loaded:,}",
+                f"Areas loaded: {areas_loaded:,}",
+            ]
 
-        if sheet_data.invalid_pwsids:
-            summary_rows.append(f"\n{len(sheet_data.invalid_pwsids)} Invalid PWSIDs found:")
-            summary_rows.append("-" * 20)
-            summary_rows.extend(sheet_data.invalid_pwsids)
+            if not point_data.missing_coords.empty:
+                name_length = point_data.missing_coords["pws_name"].str.len().max()
+                summary_rows.append(f"\n{len(point_data.missing_coords):,} Point records are missing coordinates")
+                summary_rows.append("-" * 20)
+                summary_rows.append(
+                    pd.DataFrame(point_data.missing_coords[["pws_id", "pws_name"]].value_counts())
+                    .reset_index()
+                    .rename(columns={"count": "nulls"})
+                    .to_string(
+                        col_space={"pws_id": 10, "pws_name": name_length, "nulls": 5},
+                        justify="left",
+                        index=False,
+                        formatters={
+                            "pws_name": lambda x: "{:<{width}}".format(x, width=name_length),
+                            "nulls": lambda x: "{:,}".format(x),
+                        },
+                    )
+                )
 
-        if sheet_data.duplicate_link_pwsids:
-            summary_rows.append(
-                f"\n{len(sheet_data.duplicate_link_pwsids)} Duplicate PWSIDs found in the interactive maps sheet:"
-            )
-            summary_rows.append("-" * 20)
-            for name, pwsid in sheet_data.duplicate_link_pwsids.items():
-                summary_rows.append(f"{name}: {pwsid}")
+            if sheet_data.invalid_pwsids:
+                summary_rows.append(f"\n{len(sheet_data.invalid_pwsids)} Invalid PWSIDs found:")
+                summary_rows.append("-" * 20)
+                summary_rows.extend(sheet_data.invalid_pwsids)
 
-        if sheet_data.missing_geometries:
-            summary_rows.append(f"\n{len(sheet_data.missing_geometries)} Systems are missing geometries:")
-            summary_rows.append("-" * 20)
-            for pwsid, (name, classification, area_type) in sheet_data.missing_geometries.items():
-                summary_rows.append(f"{pwsid}: {name} (classification: {classification}, type: {area_type})")
+            if sheet_data.duplicate_link_pwsids:
+                summary_rows.append(
+                    f"\n{len(sheet_data.duplicate_link_pwsids)} Duplicate PWSIDs found in the interactive maps sheet:"
+                )
+                summary_rows.append("-" * 20)
+                for name, pwsid in sheet_data.duplicate_link_pwsids.items():
+                    summary_rows.append(f"{name}: {pwsid}")
 
-        summary_message.message = "\n".join(summary_rows)
-        summary_message.attachments = tempdir_path / log_name
+            if sheet_data.missing_geometries:
+                summary_rows.append(f"\n{len(sheet_data.missing_geometries)} Systems are missing geometries:")
+                summary_rows.append("-" * 20)
+                for pwsid, (name, classification, area_type) in sheet_data.missing_geometries.items():
+                    summary_rows.append(f"{pwsid}: {name} (classification: {classification}, type: {area_type})")
 
-        skid_supervisor.notify(summary_message)
+            summary_message.message = "\n".join(summary_rows)
+            summary_message.attachments = tempdir_path / log_name
 
-        #: Remove file handler so the tempdir will close properly
-        loggers = [logging.getLogger(config.SKID_NAME), logging.getLogger("palletjack")]
-        _remove_log_file_handlers(log_name, loggers)
+            #: Flush the log and remove file handler before attaching the log so it's complete and the tempdir will
+            #: close properly
+            _remove_log_file_handlers(log_name, loggers)
+
+            skid_supervisor.notify(summary_message)
+        finally:
+            #: If a step raises, still drain the queued records and close the file handler before the tempdir is
+            #: cleaned up so the lines leading up to the error aren't lost. This is a no-op after a successful run.
+            _remove_log_file_handlers(log_name, loggers)
 
 
 class PointData:
@@ -242,78 +408,135 @@ class PointData:
         self.spatial_records = pd.DataFrame()
         self.missing_coords = pd.DataFrame()
 
-    def load_records_from_graphql(self, url: str, query: str, limit: int) -> None:
+    def load_records_from_graphql(
+        self, url: str, query: str, limit: int, concurrent_pages: int = 1, batch_size: int = 1
+    ) -> None:
         """Load records from a GraphQL endpoint in chunks
 
+        Keeps up to concurrent_pages requests in flight, requesting the next offset each time a full page comes back
+        and stopping at the first partial page. Any requests already sent past the last page are discarded. If the
+        endpoint supports query batching, batch_size pages are sent in each HTTP request.
+
         Args:
             url (str): GraphQL endpoint URL
             query (str): GraphQL query string
             limit (int): The max number of records to return per chunk
+            concurrent_pages (int, optional): The max number of requests to have in flight at once. Defaults to 1.
+            batch_size (int, optional): The number of pages to batch into each request. Defaults to 1.
         """
 
-        transport = RequestsHTTPTransport(
-            url=url,
-            verify=True,
-            retries=3,
-        )
-        client = Client(transport=transport, fetch_schema_from_transport=True)
-        query = gql(query)
-
-        result_length = limit
-        offset = 0
-        records_list = []
-
-        while result_length == limit:
-            result = client.execute(query, variable_values={"offset": offset, "limit": limit}, parse_result=True)
-            result_length = len(result["getLccrMapUGRC"])
-            module_logger.debug("Offset: %s, Length: %s", format(offset, ","), format(result_length, ","))
-            offset += limit
-            records_list.extend(result["getLccrMapUGRC"])
-
-        self.records = pd.DataFrame(records_list)
+        query = _parse_graphql_query(query)
+        step = limit * batch_size
+        pages = []
+
+        #: Each worker connects its own session when it starts; they only live for this load, so close them all once
+        #: the pool is done instead of leaving their HTTP connections open
+        thread_sessions = threading.local()
+        clients = []
+        try:
+            with ThreadPoolExecutor(
+                max_workers=concurrent_pages,
+                initializer=_connect_graphql_session,
+                initargs=(url, thread_sessions, clients),
+            ) as executor:
+                next_offset = 0
+                pending = deque()
+                for _ in range(concurrent_pages):
+                    pending.append(
+                        executor.submit(_fetch_graphql_pages, thread_sessions, query, next_offset, limit, batch_size)
+                    )
+                    next_offset += step
+
+                #: If a page fails, drop the requests still queued behind it so leaving the pool doesn't wait on
+                #: pages that will never be used
+                try:
+                    while pending:
+                        last_page = False
+                        for records in pending.popleft().result():
+                            #: Convert each page to a columnar table as it arrives instead of holding onto all the
+                            #: page dicts
+                            pages.append(pa.Table.from_pylist(records))
+                            if len(records) < limit:
+                                last_page = True
+                                break
+                        if last_page:
+                            for future in pending:
+                                future.cancel()
+                            break
+                        pending.append(
+                            executor.submit(
+                                _fetch_graphql_pages, thread_sessions, query, next_offset, limit, batch_size
+                            )
+                        )
+                        next_offset += step
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
+        finally:
+            for client in clients:
+                client.close_sync()
+
+        #: Pages may infer different types (ie, all-null columns), so let arrow promote them to a common schema. The
+        #: combined table isn't used again, so let arrow free each column as it's converted to keep peak memory down.
+        records_table = pa.concat_tables(pages, promote_options="permissive")
+        pages.clear()
+        self.records = records_table.to_pandas(split_blocks=True, self_destruct=True)
 
     def spatialize_point_data(self) -> None:
         """Convert a dataframe to a spatially-enabled dataframe accounting for both WGS84 and UTM NAD83 coordinates, logging and dropping any missing coordinates
 
-        Any rows with latitude < 100 are assumed to be WGS84, while rows with latitude > 100 are assumed to be UTM
-        NAD83.
+        Any rows with latitude < 100 are assumed to be WGS84, while all other rows are assumed to be UTM NAD83. Both are
+        projected to Web Mercator in bulk before building the arcgis point geometries.
 
         Args:
             df (pd.DataFrame): Input Dataframe with "latitude" and "longitude" columns
         """
 
-        self.missing_coords = self.records[self.records["latitude"].isna() | self.records["longitude"].isna()].copy()
+        #: Only the system info is needed to report missing coordinates
+        missing_mask = self.records["latitude"].isna() | self.records["longitude"].isna()
+        self.missing_coords = self.records.loc[missing_mask, ["pws_id", "pws_name"]].copy()
         if not self.missing_coords.empty:
             module_logger.warning("%s rows with missing coordinates", len(self.missing_coords))
-        self.records.dropna(subset=["latitude", "longitude"], inplace=True)
-
-        web_mercator_dfs = []
-
-        wgs_data = self.records[self.records["latitude"] < 100]
-        if not wgs_data.empty:
-            module_logger.debug("Loading %s rows with WGS84 coordinates", format(len(wgs_data), ","))
-            wgs_spatial = gpd.GeoDataFrame(
-                wgs_data, geometry=gpd.points_from_xy(wgs_data["longitude"], wgs_data["latitude"]), crs=4326
-            )
-            module_logger.debug("Projecting WGS84 data to Web Mercator")
-            wgs_spatial.to_crs(3857, inplace=True)
-            web_mercator_dfs.append(wgs_spatial)
-
-        utm_data = self.records[self.records["latitude"] > 100]
-        if not utm_data.empty:
-            module_logger.debug("Loading %s rows with UTM coordinates", format(len(utm_data), ","))
-            #: the values in the lat/long fields from the GraphQL query in the UTM ranges are switched x for y,
-            #: treating latitude as the x value instead of y as you would expect.
-            utm_spatial = gpd.GeoDataFrame(
-                utm_data, geometry=gpd.points_from_xy(utm_data["latitude"], utm_data["longitude"]), crs=26912
-            )
-            module_logger.debug("Projecting UTM data to Web Mercator")
-            utm_spatial.to_crs(3857, inplace=True)
-            web_mercator_dfs.append(utm_spatial)
-
-        self.spatial_records = pd.concat(web_mercator_dfs)
-        self.spatial_records.rename_geometry("SHAPE", inplace=True)
-        self.spatial_records = pd.DataFrame.spatial.from_geodataframe(self.spatial_records)
+        self.records = self.records.loc[~missing_mask]
+
+        latitude = self.records["latitude"].to_numpy(dtype=float)
+        longitude = self.records["longitude"].to_numpy(dtype=float)
+        wgs_mask = latitude < 100
+        wgs_count = wgs_mask.sum()
+        utm_count = len(latitude) - wgs_count
+        if wgs_count:
+            module_logger.debug("Projecting %s rows with WGS84 coordinates", format(wgs_count, ","))
+        if utm_count:
+            module_logger.debug("Projecting %s rows with UTM coordinates", format(utm_count, ","))
+
+        #: the values in the lat/long fields from the GraphQL query in the UTM ranges are switched x for y,
+        #: treating latitude as the x value instead of y as you would expect.
+        if not utm_count:
+            #: Skip the masked copies when every row is in the same system
+            x, y = _wgs84_to_web_mercator(longitude, latitude)
+        elif not wgs_count:
+            x, y = UTM_TO_WEB_MERCATOR.transform(latitude, longitude)
+        else:
+            utm_mask = ~wgs_mask
+            x = np.empty_like(latitude)
+            y = np.empty_like(latitude)
+            x[wgs_mask], y[wgs_mask] = _wgs84_to_web_mercator(longitude[wgs_mask], latitude[wgs_mask])
+            x[utm_mask], y[utm_mask] = UTM_TO_WEB_MERCATOR.transform(latitude[utm_mask], longitude[utm_mask])
+
+        #: Build the arcgis points directly instead of going through shapely and from_geodataframe. Setting the spatial
+        #: reference on each point lets set_geometry pick it up without another pass over the geometries. The spatial
+        #: frame only adds a column, so a shallow copy shares the existing column data instead of copying every row.
+        self.spatial_records = self.records.copy(deep=False)
+        self.spatial_records["SHAPE"] = np.fromiter(
+            (
+                arcgis.geometry.Point({"x": point_x, "y": point_y, "spatialReference": {"wkid": 3857}})
+                for point_x, point_y in zip(x.tolist(), y.tolist())
+            ),
+            dtype=object,
+            count=len(x),
+        )
+        self.spatial_records.spatial.set_geometry("SHAPE")
 
     def clean_point_data(self) -> None:
         """Rename columns for AGOL, convert to 5-digit ZIPs, and convert column dtypes"""
@@ -322,8 +545,14 @@ class PointData:
             columns={"serviceline_material_cassification": "serviceline_material_cassificat"}, inplace=True
         )
 
-        #: Strip off trailing digits for any zipcodes in ZIP+4 format
-        self.spatial_records["pws_zipcode"] = self.spatial_records["pws_zipcode"].astype(str).str[:5].astype("Int64")
+        #: Strip off trailing digits for any zipcodes in ZIP+4 format. Zipcodes that all came through as numbers can be
+        #: trimmed with integer math instead of a round trip through strings.
+        zipcodes = self.spatial_records["pws_zipcode"]
+        if pd.api.types.is_numeric_dtype(zipcodes):
+            zipcodes = zipcodes.astype("Int64")
+            self.spatial_records["pws_zipcode"] = zipcodes.where(zipcodes < 100000, zipcodes // 10000)
+        else:
+            self.spatial_records["pws_zipcode"] = zipcodes.str.slice(stop=5).astype("Int64")
 
         self.spatial_records = transform.DataCleaning.switch_to_nullable_int(
             self.spatial_records, ["pws_population", "system_id"]
@@ -347,6 +576,9 @@ class GoogleSheetData:
         self._links_sheet_id = links_sheet_id
         self._links_sheet_name = links_sheet_name
 
+        #: Authorize once and share the client between both sheets
+        self._gsheet_extractor = extract.GSheetLoader(credentials)
+
         #: Initialize instance variable
         self.systems = pd.DataFrame()
         self.links = pd.DataFrame()
@@ -363,17 +595,18 @@ class GoogleSheetData:
         """Load data from a Google sheet via palletjack using the second row as the header"""
 
         module_logger.debug("Loading systems from Google Sheet...")
-        gsheet_extractor = extract.GSheetLoader(self._credentials)
-        self.systems = gsheet_extractor.load_specific_worksheet_into_dataframe(
+        sheet_data = self._gsheet_extractor.load_specific_worksheet_into_dataframe(
             self._systems_sheet_id, self._systems_sheet_name, by_title=True
         )
 
         #: The loader treats the first row of the sheet as the header, but in this case it's the second row
-        #: So, the first row of the dataframe is the second row of the sheet and should be used as the header
-        self.systems.columns = self.systems.iloc[0]
-        self.systems.columns.name = None
-        self.systems = self.systems[1:]
-        self.systems.replace("", np.nan, inplace=True)
+        #: So, the first row of the dataframe is the second row of the sheet and should be used as the header.
+        #: Blank out the empty cells on a single array copy of the remaining rows and build the frame once from it.
+        values = sheet_data.iloc[1:].to_numpy(dtype=object)
+        values[values == ""] = np.nan
+        self.systems = pd.DataFrame(
+            values, columns=sheet_data.iloc[0].to_list(), index=sheet_data.index[1:]
+        ).infer_objects()
 
     def clean_approved_systems(self) -> None:
         """Clean up the PWS IDs, log any invalid IDs, and drop all but the most recent entry for each PWS ID"""
@@ -384,33 +617,39 @@ class GoogleSheetData:
             ["PWS ID", "Time", "System Name", "Approved", "SC, LC, on NTNC"]
         ]
 
-        #: Check for pwsids that dont have digits and report
+        #: Check for pwsids that dont have digits and report; the same extract gives us the cleaned pwsid
         non_na_systems["PWS ID"] = non_na_systems["PWS ID"].astype(str)
-        invalid_pwsids = non_na_systems[non_na_systems["PWS ID"].str.match(r"^[^\d]*$")]
-        if not invalid_pwsids.empty:
-            module_logger.warning(
-                "The following PWSIDs are invalid: %s", ", ".join(invalid_pwsids["PWS ID"].astype(str).tolist())
-            )
-            self.invalid_pwsids = invalid_pwsids["PWS ID"].tolist()
-            non_na_systems = non_na_systems[~non_na_systems["PWS ID"].str.match(r"^[^\d]*$")]
+        pwsid_digits = non_na_systems["PWS ID"].str.extract(PWSID_DIGITS_REGEX, expand=False)
+        invalid_mask = pwsid_digits.isna()
+        if invalid_mask.any():
+            self.invalid_pwsids = non_na_systems.loc[invalid_mask, "PWS ID"].tolist()
+            if module_logger.isEnabledFor(logging.WARNING):
+                module_logger.warning("The following PWSIDs are invalid: %s", ", ".join(self.invalid_pwsids))
+            non_na_systems = non_na_systems.loc[~invalid_mask].copy()
 
         #: Clean pwsid, time
-        non_na_systems["PWS ID"] = non_na_systems["PWS ID"].str.lower().str.strip("utah").astype(int)
-        non_na_systems["Time"] = pd.to_datetime(non_na_systems["Time"], format="mixed")
+        non_na_systems["PWS ID"] = pwsid_digits[~invalid_mask].astype(int)
+        #: Parse the usual form timestamp format in one pass and only fall back to per-row inference for the rest
+        submitted_times = pd.to_datetime(non_na_systems["Time"], format=FORM_TIME_FORMAT, errors="coerce")
+        unparsed = submitted_times.isna() & non_na_systems["Time"].notna()
+        if unparsed.any():
+            submitted_times.loc[unparsed] = pd.to_datetime(non_na_systems.loc[unparsed, "Time"], format="mixed")
+        non_na_systems["Time"] = submitted_times
         non_na_systems.rename(columns={"PWS ID": "PWSID", "Time": "submitted_time"}, inplace=True)
         non_na_systems["area_type"] = "Approved System"
 
-        #: Only use the most recent approval for each system
-        self.cleaned_systems_dataframe = non_na_systems.sort_values("submitted_time").drop_duplicates(
-            subset="PWSID", keep="last"
-        )
+        #: Only use the most recent approval for each system; rows without a time are treated as the oldest. idxmax
+        #: returns the first of any tied rows (ie, date-only times), so run it bottom-up to keep the later sheet row,
+        #: then put the kept rows back in sheet order.
+        submitted_times = non_na_systems["submitted_time"].fillna(pd.Timestamp.min).iloc[::-1]
+        most_recent = submitted_times.groupby(non_na_systems["PWSID"].iloc[::-1], sort=False).idxmax()
+        self.cleaned_systems_dataframe = non_na_systems.loc[most_recent.sort_values()]
 
     def load_system_links_from_gsheet(self) -> None:
-        """Load the interactive maps sheet from Google Sheets using a new extractor"""
+        """Load the interactive maps sheet from Google Sheets using the shared extractor"""
 
         module_logger.debug("Loading interactive map links sheet from Google Sheets...")
-        gsheet_extractor = extract.GSheetLoader(self._credentials)
-        self.links = gsheet_extractor.load_specific_worksheet_into_dataframe(
+        self.links = self._gsheet_extractor.load_specific_worksheet_into_dataframe(
             self._links_sheet_id, self._links_sheet_name, by_title=True
         )
 
@@ -419,22 +658,28 @@ class GoogleSheetData:
 
         module_logger.debug("Cleaning interactive map links data...")
 
-        #: Drop empty rows, unneeded columns
-        self.links.replace("", np.nan, inplace=True)
-        self.links.dropna(subset=["PWSID"], inplace=True)
-        self.links = self.links[["PWSID", "Water Systme Name", "Interactive map link"]].copy()
+        #: Drop empty rows and unneeded columns before blanking out empty strings in what's left
+        pwsids = self.links["PWSID"]
+        has_pwsid = pwsids.notna() & (pwsids != "")
+        self.links = self.links.loc[has_pwsid, ["PWSID", "Water Systme Name", "Interactive map link"]].replace(
+            "", np.nan
+        )
 
         #: Clean PWSID, drop duplicates, rename columns
-        self.links["PWSID"] = self.links["PWSID"].str.lower().str.strip("utah").astype(int)
+        self.links["PWSID"] = self.links["PWSID"].str.extract(PWSID_DIGITS_REGEX, expand=False).astype(int)
         self.links.rename(columns={"Water Systme Name": "System Name"}, inplace=True)
-        duplicated_links = self.links[self.links["PWSID"].duplicated(keep=False)]
-
-        if not duplicated_links.empty:
-            module_logger.warning(
-                "Duplicate PWSIDs found in the interactive maps sheet: %s",
-                ", ".join(duplicated_links["PWSID"].astype(str).tolist()),
+        duplicated_mask = self.links["PWSID"].duplicated(keep=False)
+
+        if duplicated_mask.any():
+            duplicated_pwsids = self.links.loc[duplicated_mask, "PWSID"].to_numpy()
+            if module_logger.isEnabledFor(logging.WARNING):
+                module_logger.warning(
+                    "Duplicate PWSIDs found in the interactive maps sheet: %s",
+                    ", ".join(map(str, duplicated_pwsids)),
+                )
+            self.duplicate_link_pwsids = dict(
+                zip(self.links.loc[duplicated_mask, "System Name"].tolist(), duplicated_pwsids.tolist())
             )
-            self.duplicate_link_pwsids = {row["System Name"]: row["PWSID"] for _, row in duplicated_links.iterrows()}
 
         self.links.drop_duplicates(subset="PWSID", keep="last", inplace=True)
         self.links["area_type"] = "Link"
@@ -455,7 +700,7 @@ class GoogleSheetData:
         water_service_areas["DWSYSNUM"] = water_service_areas["DWSYSNUM"].str.strip().replace("", np.nan)
         self.cleaned_water_service_areas = water_service_areas[~(water_service_areas["DWSYSNUM"].isna())].copy()
         self.cleaned_water_service_areas["PWSID"] = (
-            self.cleaned_water_service_areas["DWSYSNUM"].str.lower().str.strip("utahz").astype(int)
+            self.cleaned_water_service_areas["DWSYSNUM"].str.extract(PWSID_DIGITS_REGEX, expand=False).astype(int)
         )
 
     def merge_systems(self) -> None:
@@ -494,30 +739,48 @@ class GoogleSheetData:
     def merge_systems_with_geometries(self) -> None:
         """Merge geometries to system data, logging any systems that don't have a matching geometry"""
 
-        merged = self.all_systems.merge(self.cleaned_water_service_areas, on="PWSID", how="left")
-        no_area = merged[merged["FID"].isna()]
+        #: PWSID is an int64 on both sides by now, so the join hashes integers rather than strings
+        merged = self.all_systems.merge(self.cleaned_water_service_areas, on="PWSID", how="left", sort=False)
+        has_area = merged["FID"].notna().to_numpy()
+        no_area = merged.loc[~has_area]
         if not no_area.empty:
-            self.missing_geometries = {
-                row["PWSID"]: (row["System Name"], row["SC, LC, on NTNC"], row["area_type"])
-                for _, row in no_area.sort_values(by="PWSID").iterrows()
-            }
-            module_logger.warning(
-                "The following PWSIDs from the approved systems sheet and/or interactive maps sheet were not found in the service areas layer: %s",
-                ", ".join(no_area["PWSID"].astype(str).tolist()),
+            sorted_no_area = no_area.sort_values(by="PWSID")
+            self.missing_geometries = dict(
+                zip(
+                    sorted_no_area["PWSID"].tolist(),
+                    zip(
+                        sorted_no_area["System Name"].tolist(),
+                        sorted_no_area["SC, LC, on NTNC"].tolist(),
+                        sorted_no_area["area_type"].tolist(),
+                    ),
+                )
             )
-        self.final_systems = merged.dropna(subset=["FID"])
+            if module_logger.isEnabledFor(logging.WARNING):
+                module_logger.warning(
+                    "The following PWSIDs from the approved systems sheet and/or interactive maps sheet were not found in the service areas layer: %s",
+                    ", ".join(map(str, no_area["PWSID"].to_numpy())),
+                )
+        #: The left merge upcasts FID to float when any system is missing an area; every remaining row has one, so put
+        #: it back to the service areas' integer dtype
+        self.final_systems = merged.loc[has_area].astype({"FID": self.cleaned_water_service_areas["FID"].dtype})
 
     def clean_dataframe_for_agol(self) -> None:
         """AGOL-ize and lowercase the column names and remove the area and length columns"""
 
         module_logger.debug("Cleaning dataframe for AGOL...")
-        cleaned_columns = {
-            original_name: agol_name.lower()
-            for original_name, agol_name in utils.rename_columns_for_agol(self.final_systems.columns).items()
-        }
-        cleaned_columns.pop("SHAPE")
-        self.final_systems.rename(columns=cleaned_columns, inplace=True)
-        self.final_systems.drop(columns=["shape__area", "shape__length"], inplace=True)
+        cleaned_columns = _agol_column_names(tuple(self.final_systems.columns))
+
+        #: Drop the area and length columns first so only the kept columns get renamed, then set the new names
+        #: directly rather than mapping every column through rename
+        self.final_systems.drop(
+            columns=[
+                original_name
+                for original_name, agol_name in cleaned_columns.items()
+                if agol_name in ("shape__area", "shape__length")
+            ],
+            inplace=True,
+        )
+        self.final_systems.columns = [cleaned_columns.get(column, column) for column in self.final_systems.columns]
 
 
 #: Putting this here means you can call the file via `python main.py` and it will run. Useful for pre-GCF testing.
@@ -1,14 +1,39 @@
 import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from unittest.mock import create_autospec
 
 import numpy as np
 import pandas as pd
+import pytest
+from pyproj import Transformer
 
 from lsli import main
 
 
+@pytest.fixture(scope="module")
+def transport_autospec():
+    #: Autospeccing the transport class is slow, so build it once and reset it for each test
+    return create_autospec(main.RequestsHTTPTransport)
+
+
+@pytest.fixture
+def transport_mock(mocker, transport_autospec):
+    transport_autospec.reset_mock()
+    return mocker.patch("lsli.main.RequestsHTTPTransport", new=transport_autospec)
+
+
+@pytest.fixture
+def session_mock(mocker, transport_mock):
+    session_mock = mocker.Mock()
+    mocker.patch("lsli.main.Client").return_value.connect_sync.return_value = session_mock
+    return session_mock
+
+
 def test_get_secrets_from_gcp_location(mocker):
+    main._get_secrets.cache_clear()
     mocker.patch("pathlib.Path.exists", return_value=True)
-    mocker.patch("pathlib.Path.read_text", return_value='{"foo":"bar"}')
+    mocker.patch("pathlib.Path.read_bytes", return_value=b'{"foo":"bar"}')
 
     secrets = main._get_secrets()
 
@@ -16,9 +41,10 @@ def test_get_secrets_from_gcp_location(mocker):
 
 
 def test_get_secrets_from_local_location(mocker):
+    main._get_secrets.cache_clear()
     exists_mock = mocker.Mock(side_effect=[False, True])
     mocker.patch("pathlib.Path.exists", new=exists_mock)
-    mocker.patch("pathlib.Path.read_text", return_value='{"foo":"bar"}')
+    mocker.patch("pathlib.Path.read_bytes", return_value=b'{"foo":"bar"}')
 
     secrets = main._get_secrets()
 
@@ -26,22 +52,124 @@ def test_get_secrets_from_local_location(mocker):
     assert exists_mock.call_count == 2
 
 
+def test_get_secrets_only_reads_file_once(mocker):
+    main._get_secrets.cache_clear()
+    mocker.patch("pathlib.Path.exists", return_value=True)
+    read_mock = mocker.patch("pathlib.Path.read_bytes", return_value=b'{"foo":"bar"}')
+
+    main._get_secrets()
+    secrets = main._get_secrets()
+
+    assert secrets == {"foo": "bar"}
+    read_mock.assert_called_once()
+
+
+def test_remove_log_file_handlers_flushes_and_closes_file(tmp_path):
+    log_path = tmp_path / "log.txt"
+    file_handler = logging.FileHandler(log_path, mode="w")
+    log_queue = SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.listener = QueueListener(log_queue, file_handler)
+    queue_handler.listener.start()
+
+    first_logger = logging.getLogger("test_first")
+    second_logger = logging.getLogger("test_second")
+    first_logger.addHandler(queue_handler)
+    second_logger.addHandler(queue_handler)
+    first_logger.warning("foo")
+
+    main._remove_log_file_handlers("log.txt", [first_logger, second_logger])
+
+    assert queue_handler not in first_logger.handlers
+    assert queue_handler not in second_logger.handlers
+    assert file_handler.stream is None
+    assert "foo" in log_path.read_text()
+
+
+def test_process_flushes_log_file_when_a_step_raises(mocker, tmp_path):
+    secrets = {"SENDGRID_API_KEY": "key", "AGOL_USER": "user", "AGOL_PASSWORD": "password", "GRAPHQL_URL": "url"}
+    mocker.patch("lsli.main._get_secrets", return_value=secrets)
+    mocker.patch("lsli.main.TemporaryDirectory").return_value.__enter__.return_value = str(tmp_path)
+    mocker.patch("lsli.main.Supervisor")
+    mocker.patch("lsli.main.SendGridHandler")
+    mocker.patch("lsli.main.arcgis.gis.GIS")
+    mocker.patch("lsli.main.sys.stdout")
+
+    def _fail_after_logging(*args, **kwargs):
+        for i in range(5000):
+            main.module_logger.debug("line %s", i)
+        main.module_logger.error("last words")
+        raise RuntimeError("boom")
+
+    mocker.patch.object(main.PointData, "load_records_from_graphql", _fail_after_logging)
+
+    try:
+        with pytest.raises(RuntimeError, match="boom"):
+            main.process()
+    finally:
+        logging.captureWarnings(False)
+
+    log_text = next(tmp_path.glob("log_*.txt")).read_text()
+    assert "line 4999" in log_text
+    assert log_text.rstrip().endswith("last words")
+    assert not any(isinstance(handler, QueueHandler) for handler in main.module_logger.handlers)
+
+
+def test_wgs84_to_web_mercator_matches_pyproj():
+    longitude = np.array([-114.05, -111.0, -109.04, 0.0])
+    latitude = np.array([37.0, 40.0, 42.0, -60.0])
+
+    x, y = main._wgs84_to_web_mercator(longitude, latitude)
+
+    expected_x, expected_y = Transformer.from_crs(4326, 3857, always_xy=True).transform(longitude, latitude)
+    np.testing.assert_allclose(x, expected_x, atol=1e-6)
+    np.testing.assert_allclose(y, expected_y, atol=1e-6)
+
+
 class TestPointData:
-    def test_load_records_from_graphql_extends_list(self, mocker):
-        mocker.patch("lsli.main.RequestsHTTPTransport", autospec=True)
-        mocker.patch("lsli.main.gql", autospec=True)
+    @pytest.fixture(autouse=True)
+    def debug_logging(self, caplog):
+        #: The spatialize tests check the debug-level row counts
+        caplog.set_level(logging.DEBUG)
 
-        client_mock = mocker.Mock(spec=main.Client)
-        client_mock.execute.side_effect = [
+    @pytest.mark.parametrize(
+        "last_page",
+        [
+            pytest.param([], id="extends_list"),
+            pytest.param([{"foo": "bop"}], id="stops_on_partial_length_result"),
+        ],
+    )
+    def test_load_records_from_graphql_pages_until_short_page(self, mocker, session_mock, last_page):
+        session_mock.execute.side_effect = [
             {"getLccrMapUGRC": [{"foo": "bar"}, {"foo": "baz"}]},
             {"getLccrMapUGRC": [{"foo": "boo"}, {"foo": "bat"}]},
-            {"getLccrMapUGRC": []},
+            {"getLccrMapUGRC": last_page},
         ]
-        mocker.patch("lsli.main.Client", return_value=client_mock)
 
         point_data_mock = mocker.Mock(spec=main.PointData)
+        main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2)
+
+        expected_df = pd.DataFrame([{"foo": "bar"}, {"foo": "baz"}, {"foo": "boo"}, {"foo": "bat"}, *last_page])
+
+        pd.testing.assert_frame_equal(point_data_mock.records, expected_df)
+        assert [call.args[0].variable_values for call in session_mock.execute.call_args_list] == [
+            {"offset": 0, "limit": 2},
+            {"offset": 2, "limit": 2},
+            {"offset": 4, "limit": 2},
+        ]
+
+    def test_load_records_from_graphql_keeps_page_order_with_concurrent_pages(self, mocker, session_mock):
+        pages = {
+            0: [{"foo": "bar"}, {"foo": "baz"}],
+            2: [{"foo": "boo"}, {"foo": "bat"}],
+            4: [{"foo": "bop"}],
+        }
+        session_mock.execute.side_effect = lambda request, parse_result: {
+            "getLccrMapUGRC": pages.get(request.variable_values["offset"], [])
+        }
 
-        main.PointData.load_records_from_graphql(point_data_mock, "url", "query", 2)
+        point_data_mock = mocker.Mock(spec=main.PointData)
+        main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2, concurrent_pages=3)
 
         expected_df = pd.DataFrame(
             [
@@ -49,25 +177,24 @@ class TestPointData:
                 {"foo": "baz"},
                 {"foo": "boo"},
                 {"foo": "bat"},
+                {"foo": "bop"},
             ]
         )
 
         pd.testing.assert_frame_equal(point_data_mock.records, expected_df)
 
-    def test_load_records_from_graphql_stops_on_partial_length_result(self, mocker):
-        mocker.patch("lsli.main.RequestsHTTPTransport", autospec=True)
-        mocker.patch("lsli.main.gql", autospec=True)
-
-        client_mock = mocker.Mock(spec=main.Client)
-        client_mock.execute.side_effect = [
-            {"getLccrMapUGRC": [{"foo": "bar"}, {"foo": "baz"}]},
-            {"getLccrMapUGRC": [{"foo": "boo"}, {"foo": "bat"}]},
-            {"getLccrMapUGRC": [{"foo": "bop"}]},
+    def test_load_records_from_graphql_batches_pages_and_stops_mid_batch(self, mocker, session_mock):
+        pages = {
+            0: [{"foo": "bar"}, {"foo": "baz"}],
+            2: [{"foo": "boo"}, {"foo": "bat"}],
+            4: [{"foo": "bop"}],
+        }
+        session_mock.execute_batch.side_effect = lambda requests, parse_result: [
+            {"getLccrMapUGRC": pages.get(request.variable_values["offset"], [])} for request in requests
         ]
-        mocker.patch("lsli.main.Client", return_value=client_mock)
 
         point_data_mock = mocker.Mock(spec=main.PointData)
-        main.PointData.load_records_from_graphql(point_data_mock, "url", "query", 2)
+        main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2, batch_size=2)
 
         expected_df = pd.DataFrame(
             [
@@ -80,129 +207,157 @@ class TestPointData:
         )
 
         pd.testing.assert_frame_equal(point_data_mock.records, expected_df)
+        assert session_mock.execute_batch.call_count == 2
+        session_mock.execute.assert_not_called()
+
+    def test_load_records_from_graphql_closes_its_sessions_after_each_load(self, mocker, transport_mock):
+        client_class_mock = mocker.patch("lsli.main.Client")
+        client_class_mock.return_value.connect_sync.return_value.execute.return_value = {"getLccrMapUGRC": []}
 
-    def test_spatialize_data_logs_and_drops_na_coords(self, mocker, caplog):
-        gdf_class_mock = mocker.patch("lsli.main.gpd.GeoDataFrame", autospec=True)
-        points_from_xy_mock = mocker.patch.object(main.gpd, "points_from_xy")
-        concat_mock = mocker.patch.object(main.pd, "concat", autospec=True)
         point_data_mock = mocker.Mock(spec=main.PointData)
-        mocker.patch.object(main.pd.DataFrame.spatial, "from_geodataframe", autospec=True)
+        main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2)
+        main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2)
 
-        caplog.set_level(logging.DEBUG)
+        #: Each load connects its own session rather than reusing one from an earlier load, and closes it when done
+        assert client_class_mock.call_count == 2
+        assert client_class_mock.call_args.kwargs["fetch_schema_from_transport"] is False
+        assert client_class_mock.return_value.connect_sync.call_count == 2
+        assert client_class_mock.return_value.close_sync.call_count == 2
 
-        df = pd.DataFrame(
-            {
-                "latitude": [np.nan, 40.0],
-                "longitude": [-112.0, -111.0],
-            }
-        )
-        point_data_mock.records = df
+    def test_load_records_from_graphql_closes_sessions_when_a_page_fails(self, mocker, transport_mock):
+        client_class_mock = mocker.patch("lsli.main.Client")
+        client_class_mock.return_value.connect_sync.return_value.execute.side_effect = RuntimeError("boom")
 
-        main.PointData.spatialize_point_data(point_data_mock)
+        point_data_mock = mocker.Mock(spec=main.PointData)
+        with pytest.raises(RuntimeError, match="boom"):
+            main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2)
 
-        missing_rows = pd.DataFrame({"latitude": [np.nan], "longitude": [-112.0]})
+        client_class_mock.return_value.close_sync.assert_called_once()
 
-        #: Make sure NA row is logged
-        pd.testing.assert_frame_equal(point_data_mock.missing_coords, missing_rows)
+    def test_load_records_from_graphql_cancels_queued_pages_when_a_page_fails(self, mocker, session_mock):
+        failed_future = mocker.Mock()
+        failed_future.result.side_effect = RuntimeError("boom")
+        queued_futures = [mocker.Mock(), mocker.Mock()]
+        executor_mock = mocker.patch("lsli.main.ThreadPoolExecutor").return_value.__enter__.return_value
+        executor_mock.submit.side_effect = [failed_future, *queued_futures]
 
-        #: Make sure full dataframe is used and there's only one call
-        pd.testing.assert_series_equal(points_from_xy_mock.call_args_list[0][0][0], df.dropna()["longitude"])
-        pd.testing.assert_series_equal(points_from_xy_mock.call_args_list[0][0][1], df.dropna()["latitude"])
-        assert gdf_class_mock.call_args_list[0].kwargs["crs"] == 4326
-        points_from_xy_mock.assert_called_once()
+        point_data_mock = mocker.Mock(spec=main.PointData)
+        with pytest.raises(RuntimeError, match="boom"):
+            main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2, concurrent_pages=3)
 
-        #: Make sure log shows only WGS84 processed
-        assert "1 rows with WGS84 coordinates" in caplog.text
-        assert "rows with UTM coordinates" not in caplog.text
-        assert "1 rows with missing coordinates" in caplog.text
+        for future in queued_futures:
+            future.cancel.assert_called_once()
 
-        #: Make sure reprojection and concat only called once/with one item
-        assert len(gdf_class_mock.method_calls) == 1
-        assert gdf_class_mock.method_calls[0] == mocker.call().to_crs(3857, inplace=True)
-        concat_mock.assert_called_once_with([gdf_class_mock.return_value])
+    def test_load_records_from_graphql_promotes_types_across_pages(self, mocker, session_mock):
+        session_mock.execute.side_effect = [
+            {"getLccrMapUGRC": [{"foo": "bar", "latitude": None}, {"foo": "baz", "latitude": None}]},
+            {"getLccrMapUGRC": [{"foo": None, "latitude": 40.5}]},
+        ]
 
-    def test_spatialize_data_sorts_different_projections(self, mocker, caplog):
-        gdf_class_mock = mocker.patch("lsli.main.gpd.GeoDataFrame", autospec=True)
-        points_from_xy_mock = mocker.patch.object(main.gpd, "points_from_xy")
-        concat_mock = mocker.patch.object(main.pd, "concat", autospec=True)
         point_data_mock = mocker.Mock(spec=main.PointData)
-        mocker.patch.object(main.pd.DataFrame.spatial, "from_geodataframe", autospec=True)
+        main.PointData.load_records_from_graphql(point_data_mock, "url", "query { foo }", 2)
 
-        caplog.set_level(logging.DEBUG)
-
-        df = pd.DataFrame(
+        expected_df = pd.DataFrame(
             {
-                "latitude": [123.0, 40.0],
-                "longitude": [0.0, 0.0],
+                "foo": ["bar", "baz", None],
+                "latitude": [np.nan, np.nan, 40.5],
             }
         )
-        point_data_mock.records = df
 
-        main.PointData.spatialize_point_data(point_data_mock)
-
-        #: test that right dataframe subsets are called in order
-        #: the values in the lat/long fields from the GraphQL query in the UTM ranges are switched x for y, so
-        #: switching which fields to use so that latitude is treated as the x value instead of y as you would expect.
-        pd.testing.assert_series_equal(
-            points_from_xy_mock.call_args_list[0][0][0], df[df["latitude"] < 100]["longitude"]
-        )
-        pd.testing.assert_series_equal(
-            points_from_xy_mock.call_args_list[0][0][1], df[df["latitude"] < 100]["latitude"]
-        )
-        pd.testing.assert_series_equal(
-            points_from_xy_mock.call_args_list[1][0][0], df[df["latitude"] >= 100]["latitude"]
-        )
-        pd.testing.assert_series_equal(
-            points_from_xy_mock.call_args_list[1][0][1], df[df["latitude"] >= 100]["longitude"]
-        )
+        pd.testing.assert_frame_equal(point_data_mock.records, expected_df)
 
-        #: Make sure log messages reflect proper number of rows
-        assert "1 rows with WGS84 coordinates" in caplog.text
-        assert "1 rows with UTM coordinates" in caplog.text
-
-        #: Check projection calls
-        assert gdf_class_mock.call_args_list[0].kwargs["crs"] == 4326
-        assert gdf_class_mock.call_args_list[1].kwargs["crs"] == 26912
-
-        #: Check final projection and concatenation
-        assert len(gdf_class_mock.method_calls) == 2
-        assert gdf_class_mock.method_calls[0] == mocker.call().to_crs(3857, inplace=True)
-        assert gdf_class_mock.method_calls[1] == mocker.call().to_crs(3857, inplace=True)
-        concat_mock.assert_called_once_with([gdf_class_mock.return_value, gdf_class_mock.return_value])
-
-    def test_spatialize_data_handles_no_utm_coords(self, mocker, caplog):
-        gdf_class_mock = mocker.patch("lsli.main.gpd.GeoDataFrame", autospec=True)
-        points_from_xy_mock = mocker.patch.object(main.gpd, "points_from_xy")
-        concat_mock = mocker.patch.object(main.pd, "concat", autospec=True)
+    @pytest.mark.parametrize(
+        "records, expected_sources, expected_messages, unexpected_message, expected_missing",
+        [
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "latitude": [np.nan, 40.0],
+                        "longitude": [-112.0, -111.0],
+                        "pws_id": ["UTAH1234", "UTAH4567"],
+                        "pws_name": ["foo", "bar"],
+                    }
+                ),
+                [(4326, -111.0, 40.0)],
+                ["1 rows with WGS84 coordinates", "1 rows with missing coordinates"],
+                "rows with UTM coordinates",
+                pd.DataFrame({"pws_id": ["UTAH1234"], "pws_name": ["foo"]}),
+                id="logs_and_drops_na_coords",
+            ),
+            #: the values in the lat/long fields from the GraphQL query in the UTM ranges are switched x for y, so
+            #: latitude should be treated as the x value instead of y as you would expect.
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "latitude": [425000.0, 40.0],
+                        "longitude": [4500000.0, -111.0],
+                        "pws_id": ["UTAH1234", "UTAH4567"],
+                        "pws_name": ["foo", "bar"],
+                    }
+                ),
+                [(26912, 425000.0, 4500000.0), (4326, -111.0, 40.0)],
+                ["1 rows with WGS84 coordinates", "1 rows with UTM coordinates"],
+                "rows with missing coordinates",
+                None,
+                id="sorts_different_projections",
+            ),
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "latitude": [41.0, 40.0],
+                        "longitude": [-111.0, -111.0],
+                        "pws_id": ["UTAH1234", "UTAH4567"],
+                        "pws_name": ["foo", "bar"],
+                    }
+                ),
+                [(4326, -111.0, 41.0), (4326, -111.0, 40.0)],
+                ["2 rows with WGS84 coordinates"],
+                "rows with UTM coordinates",
+                None,
+                id="handles_no_utm_coords",
+            ),
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "latitude": [425000.0, 430000.0],
+                        "longitude": [4500000.0, 4510000.0],
+                        "pws_id": ["UTAH1234", "UTAH4567"],
+                        "pws_name": ["foo", "bar"],
+                    }
+                ),
+                [(26912, 425000.0, 4500000.0), (26912, 430000.0, 4510000.0)],
+                ["2 rows with UTM coordinates"],
+                "rows with WGS84 coordinates",
+                None,
+                id="handles_no_wgs84_coords",
+            ),
+        ],
+    )
+    def test_spatialize_data(
+        self, mocker, caplog, records, expected_sources, expected_messages, unexpected_message, expected_missing
+    ):
         point_data_mock = mocker.Mock(spec=main.PointData)
-        mocker.patch.object(main.pd.DataFrame.spatial, "from_geodataframe", autospec=True)
-
-        caplog.set_level(logging.DEBUG)
-
-        df = pd.DataFrame(
-            {
-                "latitude": [41.0, 40.0],
-                "longitude": [0.0, 0.0],
-            }
-        )
-        point_data_mock.records = df
+        point_data_mock.records = records.copy()
 
         main.PointData.spatialize_point_data(point_data_mock)
 
-        #: Make sure full dataframe is used and there's only one call
-        pd.testing.assert_series_equal(points_from_xy_mock.call_args_list[0][0][0], df["longitude"])
-        pd.testing.assert_series_equal(points_from_xy_mock.call_args_list[0][0][1], df["latitude"])
-        assert gdf_class_mock.call_args_list[0].kwargs["crs"] == 4326
-        points_from_xy_mock.assert_called_once()
+        if expected_missing is None:
+            assert point_data_mock.missing_coords.empty
+        else:
+            pd.testing.assert_frame_equal(point_data_mock.missing_coords, expected_missing)
 
-        #: Make sure log shows only WGS84 processed
-        assert "2 rows with WGS84 coordinates" in caplog.text
-        assert "rows with UTM coordinates" not in caplog.text
+        #: Only rows with coordinates are spatialized, in their original order
+        expected_xy = [
+            Transformer.from_crs(crs, 3857, always_xy=True).transform(x, y) for crs, x, y in expected_sources
+        ]
+        shape_xy = np.array([(shape.x, shape.y) for shape in point_data_mock.spatial_records["SHAPE"]])
+        assert point_data_mock.spatial_records.spatial.sr["wkid"] == 3857
+        np.testing.assert_allclose(shape_xy, expected_xy)
 
-        #: Make sure reprojection and concat only called once/with one item
-        assert len(gdf_class_mock.method_calls) == 1
-        assert gdf_class_mock.method_calls[0] == mocker.call().to_crs(3857, inplace=True)
-        concat_mock.assert_called_once_with([gdf_class_mock.return_value])
+        #: Make sure log messages reflect proper number of rows
+        for message in expected_messages:
+            assert message in caplog.text
+        assert unexpected_message not in caplog.text
 
     def test_clean_point_data_cleans_data(self, mocker):
         point_data_mock = mocker.Mock(spec=main.PointData)
@@ -220,19 +375,58 @@ class TestPointData:
         expected_df = pd.DataFrame(
             {
                 "serviceline_material_cassificat": ["foo", "bar"],
-                "pws_zipcode": [84093, 84093],
-                "pws_population": [1000, 2000],
-                "system_id": [1234, 5678],
+                "pws_zipcode": pd.array([84093, 84093], dtype="Int64"),
+                "pws_population": pd.array([1000, 2000], dtype="Int64"),
+                "system_id": pd.array([1234, 5678], dtype="Int64"),
             }
         )
-        expected_df["pws_zipcode"] = expected_df["pws_zipcode"].astype("Int64")
-        expected_df["pws_population"] = expected_df["pws_population"].astype("Int64")
-        expected_df["system_id"] = expected_df["system_id"].astype("Int64")
 
         pd.testing.assert_frame_equal(point_data_mock.spatial_records, expected_df)
 
+    def test_clean_point_data_trims_numeric_zip_plus_four(self, mocker):
+        point_data_mock = mocker.Mock(spec=main.PointData)
+        point_data_mock.spatial_records = pd.DataFrame(
+            {
+                "serviceline_material_cassification": ["foo", "bar", "baz"],
+                "pws_zipcode": [84093, 840931234, None],
+                "pws_population": ["1000", "2000", "3000"],
+                "system_id": ["1234", "5678", "9012"],
+            }
+        )
+
+        main.PointData.clean_point_data(point_data_mock)
+
+        pd.testing.assert_series_equal(
+            point_data_mock.spatial_records["pws_zipcode"],
+            pd.Series([84093, 84093, pd.NA], dtype="Int64", name="pws_zipcode"),
+        )
+
+
+@pytest.fixture(scope="module")
+def expected_approved_systems():
+    #: Shared by the approved-systems cases; the tests only compare against it, so one copy is built per module
+    return pd.DataFrame(
+        {
+            "PWSID": [1234, 4567],
+            "submitted_time": [pd.Timestamp("2024-01-23 15:55"), pd.Timestamp("2024-01-01")],
+            "System Name": ["foo", "bar"],
+            "Approved": ["Accept", "Reject"],
+            "SC, LC, on NTNC": ["SC", np.nan],
+            "area_type": ["Approved System", "Approved System"],
+        },
+        index=[0, 2],
+    )
+
 
 class TestGoogleSheetData:
+    def test_init_authorizes_single_extractor(self, mocker):
+        loader_mock = mocker.patch("lsli.main.extract.GSheetLoader")
+
+        sheet_data = main.GoogleSheetData("credentials", "systems_id", "systems_name", "links_id", "links_name")
+
+        loader_mock.assert_called_once_with("credentials")
+        assert sheet_data._gsheet_extractor is loader_mock.return_value
+
     def test_load_dataframe_from_sheet_switches_header_and_fills_nas(self, mocker):
         input_data = pd.DataFrame(
             {
@@ -242,11 +436,11 @@ class TestGoogleSheetData:
             }
         )
 
-        loader_mock = mocker.patch("lsli.main.extract.GSheetLoader")
-        loader_mock.return_value.load_specific_worksheet_into_dataframe.return_value = input_data
+        loader_mock = mocker.Mock()
+        loader_mock.load_specific_worksheet_into_dataframe.return_value = input_data
         instance_mock = mocker.Mock(
             spec=main.GoogleSheetData,
-            _credentials="credentials",
+            _gsheet_extractor=loader_mock,
             _systems_sheet_id="sheet_id",
             _systems_sheet_name="sheet_name",
         )
@@ -264,15 +458,52 @@ class TestGoogleSheetData:
 
         pd.testing.assert_frame_equal(instance_mock.systems, expected_df)
 
-    def test_clean_approved_systems_cleans_data(self, mocker):
+    @pytest.mark.parametrize(
+        "input_data",
+        [
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "PWS ID": ["Utah1234", np.nan, "4567"],
+                        "Time": ["1/23/2024 15:55", np.nan, "1/1/2024"],
+                        "System Name": ["foo", np.nan, "bar"],
+                        "Approved": ["Accept", np.nan, "Reject"],
+                        "SC, LC, on NTNC": ["SC", np.nan, np.nan],
+                        "extra column": ["yes", "no", "yes"],
+                    }
+                ),
+                id="cleans_data",
+            ),
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "PWS ID": ["Utah1234", "Utah1234", "4567"],
+                        "Time": ["1/23/2024 15:55", "1/1/2024 15:55", "1/1/2024"],
+                        "System Name": ["foo", "foo", "bar"],
+                        "Approved": ["Accept", "Reject", "Reject"],
+                        "SC, LC, on NTNC": ["SC", "SC", np.nan],
+                    }
+                ),
+                id="removes_earlier_duplicate",
+            ),
+        ],
+    )
+    def test_clean_approved_systems(self, mocker, input_data, expected_approved_systems):
+        instance_mock = mocker.Mock(spec=main.GoogleSheetData)
+        instance_mock.systems = input_data.copy()
+
+        main.GoogleSheetData.clean_approved_systems(instance_mock)
+
+        pd.testing.assert_frame_equal(instance_mock.cleaned_systems_dataframe, expected_approved_systems)
+
+    def test_clean_approved_systems_parses_form_and_other_times(self, mocker):
         input_data = pd.DataFrame(
             {
-                "PWS ID": ["Utah1234", np.nan, "4567"],
-                "Time": ["1/23/2024 15:55", np.nan, "1/1/2024"],
-                "System Name": ["foo", np.nan, "bar"],
-                "Approved": ["Accept", np.nan, "Reject"],
+                "PWS ID": ["Utah1234", "4567", "8910"],
+                "Time": ["1/23/2024 15:55:12", "2024-01-01", np.nan],
+                "System Name": ["foo", "bar", "baz"],
+                "Approved": ["Accept", "Reject", "Accept"],
                 "SC, LC, on NTNC": ["SC", np.nan, np.nan],
-                "extra column": ["yes", "no", "yes"],
             }
         )
         instance_mock = mocker.Mock(spec=main.GoogleSheetData)
@@ -280,30 +511,21 @@ class TestGoogleSheetData:
 
         main.GoogleSheetData.clean_approved_systems(instance_mock)
 
-        expected_output = pd.DataFrame(
-            {
-                "PWSID": [4567, 1234],
-                "submitted_time": ["1/1/2024", "1/23/2024 15:55"],
-                "System Name": ["bar", "foo"],
-                "Approved": ["Reject", "Accept"],
-                "SC, LC, on NTNC": [np.nan, "SC"],
-                "area_type": ["Approved System", "Approved System"],
-            },
-            index=[2, 0],
+        expected_times = pd.Series(
+            [pd.Timestamp("2024-01-23 15:55:12"), pd.Timestamp("2024-01-01"), pd.NaT],
+            index=[0, 1, 2],
+            name="submitted_time",
         )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
-        expected_output["submitted_time"] = pd.to_datetime(expected_output["submitted_time"], format="mixed")
+        pd.testing.assert_series_equal(instance_mock.cleaned_systems_dataframe["submitted_time"], expected_times)
 
-        pd.testing.assert_frame_equal(instance_mock.cleaned_systems_dataframe, expected_output)
-
-    def test_clean_approved_systems_removes_earlier_duplicate(self, mocker):
+    def test_clean_approved_systems_prefers_dated_duplicate(self, mocker):
         input_data = pd.DataFrame(
             {
-                "PWS ID": ["Utah1234", "Utah1234", "4567"],
-                "Time": ["1/23/2024 15:55", "1/1/2024 15:55", "1/1/2024"],
-                "System Name": ["foo", "foo", "bar"],
-                "Approved": ["Accept", "Reject", "Reject"],
-                "SC, LC, on NTNC": ["SC", "SC", np.nan],
+                "PWS ID": ["Utah1234", "Utah1234"],
+                "Time": ["1/1/2024 15:55", np.nan],
+                "System Name": ["foo", "foo"],
+                "Approved": ["Accept", "Reject"],
+                "SC, LC, on NTNC": ["SC", "SC"],
             }
         )
         instance_mock = mocker.Mock(spec=main.GoogleSheetData)
@@ -311,21 +533,25 @@ class TestGoogleSheetData:
 
         main.GoogleSheetData.clean_approved_systems(instance_mock)
 
-        expected_output = pd.DataFrame(
+        assert instance_mock.cleaned_systems_dataframe["Approved"].tolist() == ["Accept"]
+
+    def test_clean_approved_systems_keeps_later_row_on_tied_times(self, mocker):
+        input_data = pd.DataFrame(
             {
-                "PWSID": [4567, 1234],
-                "submitted_time": ["1/1/2024", "1/23/2024 15:55"],
-                "System Name": ["bar", "foo"],
-                "Approved": ["Reject", "Accept"],
-                "SC, LC, on NTNC": [np.nan, "SC"],
-                "area_type": ["Approved System", "Approved System"],
-            },
-            index=[2, 0],
+                "PWS ID": ["Utah1234", "4567", "Utah1234"],
+                "Time": ["1/1/2024", "1/1/2024", "1/1/2024"],
+                "System Name": ["foo", "bar", "foo"],
+                "Approved": ["Reject", "Accept", "Accept"],
+                "SC, LC, on NTNC": ["SC", np.nan, "SC"],
+            }
         )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
-        expected_output["submitted_time"] = pd.to_datetime(expected_output["submitted_time"], format="mixed")
+        instance_mock = mocker.Mock(spec=main.GoogleSheetData)
+        instance_mock.systems = input_data
 
-        pd.testing.assert_frame_equal(instance_mock.cleaned_systems_dataframe, expected_output)
+        main.GoogleSheetData.clean_approved_systems(instance_mock)
+
+        assert instance_mock.cleaned_systems_dataframe.index.tolist() == [1, 2]
+        assert instance_mock.cleaned_systems_dataframe["Approved"].tolist() == ["Accept", "Accept"]
 
     def test_clean_approved_systems_removes_and_logs_invalid_pwsids(self, mocker):
         input_data = pd.DataFrame(
@@ -344,8 +570,8 @@ class TestGoogleSheetData:
 
         expected_output = pd.DataFrame(
             {
-                "PWSID": ["1234"],
-                "submitted_time": ["1/23/2024 15:55"],
+                "PWSID": [1234],
+                "submitted_time": [pd.Timestamp("2024-01-23 15:55")],
                 "System Name": ["foo"],
                 "Approved": ["Accept"],
                 "SC, LC, on NTNC": ["SC"],
@@ -353,8 +579,6 @@ class TestGoogleSheetData:
             },
             index=[0],
         )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
-        expected_output["submitted_time"] = pd.to_datetime(expected_output["submitted_time"], format="mixed")
 
         pd.testing.assert_frame_equal(instance_mock.cleaned_systems_dataframe, expected_output)
         assert instance_mock.invalid_pwsids == ["Valley Water System"]
@@ -394,7 +618,7 @@ class TestGoogleSheetData:
                 "Interactive map link": [np.nan, "link1"],
                 "Approved": ["Accept", "Link"],
                 "Area": ["bar", "baz"],
-                "FID": [2.0, 3.0],
+                "FID": [2, 3],
             },
             index=[1, 2],
         )
@@ -476,30 +700,72 @@ class TestGoogleSheetData:
 
         pd.testing.assert_frame_equal(instance_mock.final_systems, expected_output)
 
-    def test_clean_system_links_cleans_pwsid_and_renames(self, mocker):
-        input_data = pd.DataFrame(
-            {
-                "PWSID": ["Utah1234", "UTAH4567"],
-                "Water Systme Name": ["foo", "bar"],
-                "Interactive map link": ["link1", "link2"],
-            }
-        )
-
+    @pytest.mark.parametrize(
+        "input_data, expected_pwsids, expected_names, expected_links, expected_index",
+        [
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "PWSID": ["Utah1234", "UTAH4567"],
+                        "Water Systme Name": ["foo", "bar"],
+                        "Interactive map link": ["link1", "link2"],
+                    }
+                ),
+                [1234, 4567],
+                ["foo", "bar"],
+                ["link1", "link2"],
+                [0, 1],
+                id="cleans_pwsid_and_renames",
+            ),
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "PWSID": ["Utah1234", ""],
+                        "Water Systme Name": ["foo", ""],
+                        "Interactive map link": ["link1", ""],
+                    }
+                ),
+                [1234],
+                ["foo"],
+                ["link1"],
+                [0],
+                id="removes_empty_rows",
+            ),
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "PWSID": ["Utah1234", "UTAH4567"],
+                        "Water Systme Name": ["foo", "bar"],
+                        "Interactive map link": ["link1", "link2"],
+                        "extra column": ["yes", "no"],
+                    }
+                ),
+                [1234, 4567],
+                ["foo", "bar"],
+                ["link1", "link2"],
+                [0, 1],
+                id="subsets_columns",
+            ),
+        ],
+    )
+    def test_clean_system_links(
+        self, mocker, input_data, expected_pwsids, expected_names, expected_links, expected_index
+    ):
         instance_mock = mocker.Mock(spec=main.GoogleSheetData)
-        instance_mock.links = input_data
+        instance_mock.links = input_data.copy()
 
         main.GoogleSheetData.clean_system_links(instance_mock)
 
         expected_output = pd.DataFrame(
             {
-                "PWSID": [1234, 4567],
-                "System Name": ["foo", "bar"],
-                "link": ["link1", "link2"],
-                "area_type": ["Link", "Link"],
-                "Approved": ["Link", "Link"],
-            }
+                "PWSID": expected_pwsids,
+                "System Name": expected_names,
+                "link": expected_links,
+                "area_type": ["Link"] * len(expected_pwsids),
+                "Approved": ["Link"] * len(expected_pwsids),
+            },
+            index=expected_index,
         )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
 
         pd.testing.assert_frame_equal(instance_mock.links, expected_output)
 
@@ -528,40 +794,11 @@ class TestGoogleSheetData:
             },
             index=[1],
         )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
 
         pd.testing.assert_frame_equal(instance_mock.links, expected_output)
         assert "Duplicate PWSIDs found in the interactive maps sheet: 1234, 1234" in caplog.text
         assert instance_mock.duplicate_link_pwsids == {"foo": 1234, "bar": 1234}
 
-    def test_clean_system_links_removes_empty_rows(self, mocker):
-        input_data = pd.DataFrame(
-            {
-                "PWSID": ["Utah1234", ""],
-                "Water Systme Name": ["foo", ""],
-                "Interactive map link": ["link1", ""],
-            }
-        )
-
-        instance_mock = mocker.Mock(spec=main.GoogleSheetData)
-        instance_mock.links = input_data
-
-        main.GoogleSheetData.clean_system_links(instance_mock)
-
-        expected_output = pd.DataFrame(
-            {
-                "PWSID": [1234],
-                "System Name": ["foo"],
-                "link": ["link1"],
-                "area_type": ["Link"],
-                "Approved": ["Link"],
-            },
-            index=[0],
-        )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
-
-        pd.testing.assert_frame_equal(instance_mock.links, expected_output)
-
     def test_clean_system_links_sets_status_on_missing_link(self, mocker):
         input_data = pd.DataFrame(
             {
@@ -585,35 +822,6 @@ class TestGoogleSheetData:
                 "Approved": ["Link", "NoLink"],
             }
         )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
-
-        pd.testing.assert_frame_equal(instance_mock.links, expected_output)
-
-    def test_clean_system_links_subsets_columns(self, mocker):
-        input_data = pd.DataFrame(
-            {
-                "PWSID": ["Utah1234", "UTAH4567"],
-                "Water Systme Name": ["foo", "bar"],
-                "Interactive map link": ["link1", "link2"],
-                "extra column": ["yes", "no"],
-            }
-        )
-
-        instance_mock = mocker.Mock(spec=main.GoogleSheetData)
-        instance_mock.links = input_data
-
-        main.GoogleSheetData.clean_system_links(instance_mock)
-
-        expected_output = pd.DataFrame(
-            {
-                "PWSID": [1234, 4567],
-                "System Name": ["foo", "bar"],
-                "link": ["link1", "link2"],
-                "area_type": ["Link", "Link"],
-                "Approved": ["Link", "Link"],
-            }
-        )
-        expected_output["PWSID"] = expected_output["PWSID"].astype(int)
 
         pd.testing.assert_frame_equal(instance_mock.links, expected_output)
 
@@ -637,6 +845,5 @@ class TestGoogleSheetData:
                 "PWSID": [1234],
             }
         )
-        valid_systems["PWSID"] = valid_systems["PWSID"].astype(int)
 
         pd.testing.assert_frame_equal(instance_mock.cleaned_water_service_areas, valid_systems)